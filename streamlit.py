@@ -1,13 +1,30 @@
 # filepath: c:\Users\alana\Desktop\imgtotxt\streamlit.py
 import streamlit as st
+import hashlib
+import io
 import os
-from pathlib import Path
+import re
 from dotenv import load_dotenv
 from PIL import Image
 import google.generativeai as genai
 import json
 import requests
-import base64
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import pybase64 as base64  # SIMD-accelerated drop-in for the stdlib module
+except ImportError:
+    import base64
+
+try:
+    import orjson
+except ImportError:  # optional C-accelerated JSON, fall back to stdlib
+    orjson = None
 
 # --- Constants ---
 DEFAULT_TITLE = "Trinity Catholic Media"
@@ -19,13 +36,36 @@ WHATSAPP_LINK = (
     "\n\nStay inspired daily! Follow our WhatsApp channel for the latest Bible verses: "
     "https://whatsapp.com/channel/0029VbAhLis0rGiVQd0HSw03"
 )
-REQUIRED_KEYS = [
+REQUIRED_KEYS: tuple[str, ...] = (
     "title",
     "extracted_bible_verse_malayalam",
     "bible_verse_english_translation",
     "alternative_text_for_main_content",
     "confidence_level",
-]
+)
+# Byte patterns: cleanup runs on UTF-8 bytes, which stay one byte per ASCII char even
+# when the Malayalam text would widen a str to UCS-2/UCS-4.
+FENCE_PATTERN = re.compile(rb"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+TRAILING_COMMA_PATTERN = re.compile(rb",(\s*[}\]])")
+GEMINI_PROMPT = """
+    Analyze this image and:
+    1. Identify if it contains Malayalam text (bible verse)
+    2. If Malayalam text is present, extract it and provide English translation
+    3. If no Malayalam text or unreadable, state that clearly
+    4. Title should be the bible verse reference
+    5. Provide alternative text for the main content (strictly exclude logo details) if applicable
+
+    Respond in this JSON format:
+    {
+        "contains_malayalam": boolean,
+        "title": "string or null",
+        "extracted_bible_verse_malayalam": "string or null",
+        "bible_verse_english_translation": "string or null",
+        "alternative_text_for_main_content": "string or null",
+        "confidence_level": "low/medium/high",
+        "notes": "any additional observations"
+    }
+    """
 
 class Config:
     DEFAULT_IMAGE_PATH = "tst.jpg"
@@ -33,12 +73,6 @@ class Config:
     DEFAULT_TAGS = ["bible quotes"]
 
 # --- Validators ---
-def validate_image_path(image_path: Path) -> bool:
-    if not image_path.exists():
-        st.error(f"Image file not found at '{image_path}'")
-        return False
-    return True
-
 def validate_api_key(api_key: str) -> bool:
     if not api_key:
         st.error("GEMINI_API_KEY is required.")
@@ -46,101 +80,170 @@ def validate_api_key(api_key: str) -> bool:
     return True
 
 # --- Image Loader ---
-def load_image(image_path: Path) -> Image.Image:
-    try:
-        return Image.open(image_path)
-    except Exception as e:
-        st.error(f"Error opening image: {e}")
-        return None
+def build_image_part(image_bytes: bytes, mime_type: str) -> dict:
+    # Gemini accepts the encoded bytes inline, so the image is never decoded client-side
+    return {"mime_type": mime_type, "data": image_bytes}
 
 # --- Gemini API ---
 def configure_genai(api_key: str) -> None:
     genai.configure(api_key=api_key)
 
-def get_gemini_model(model_name: str):
+@st.cache_resource(show_spinner=False)
+def get_or_build_model(api_key: str, model_name: str):
+    # Cached per (api_key, model_name) so reruns skip SDK setup; failures are not cached.
+    configure_genai(api_key)
+    return genai.GenerativeModel(model_name)
+
+def get_gemini_model(api_key: str, model_name: str):
     try:
-        return genai.GenerativeModel(model_name)
+        return get_or_build_model(api_key, model_name)
     except Exception as e:
         st.error(f"Error: Could not load model '{model_name}'. Details: {e}")
         return None
 
-def generate_gemini_content(model, prompt: str, image: Image.Image):
-    try:
-        response = model.generate_content([prompt, image])
-        return response.text
-    except Exception as e:
-        st.error(f"Error during Gemini API call: {e}")
-        return None
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)
+def cached_gemini_infer(image_digest: bytes, prompt: str, model_name: str, _api_key: str, _image_part: dict) -> str:
+    # Keyed on the image digest, prompt and model; underscore-prefixed args are not hashed.
+    model = get_or_build_model(_api_key, model_name)
+    return model.generate_content([prompt, _image_part]).text
 
 # --- Formatter ---
-def clean_json_string(json_str: str) -> str:
-    cleaned = json_str.strip()
-    for marker in ["```json", "```"]:
-        if cleaned.startswith(marker):
-            cleaned = cleaned[len(marker):]
-        if cleaned.endswith(marker):
-            cleaned = cleaned[:-len(marker)]
-    cleaned = cleaned.strip()
-    cleaned = cleaned.replace(",\n}", "\n}").replace(",\n]", "\n]")
-    return cleaned
-
-def parse_json_safely(json_str: str, original_str: str):
+# Formatter functions are pure (no st.* calls) so their results can be cached;
+# callers surface any errors or warnings.
+def clean_json_string(json_str: str) -> bytes:
+    raw = json_str.encode("utf-8")
+    return TRAILING_COMMA_PATTERN.sub(rb"\1", FENCE_PATTERN.sub(b"", raw)).strip()
+
+def parse_json_safely(json_bytes: bytes, original_str: str):
     try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        st.error(f"Error parsing JSON: {e}\nRaw output was:\n{original_str}")
-        return None
+        if orjson is not None:
+            return orjson.loads(json_bytes), None
+        return json.loads(json_bytes), None
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses this
+        return None, f"Error parsing JSON: {e}\nRaw output was:\n{original_str}"
 
 def ensure_required_fields(data):
-    return {key: data.get(key) for key in REQUIRED_KEYS} if isinstance(data, dict) else {}
+    if type(data) is not dict:
+        return {}
+    get = data.get  # bind once instead of an attribute lookup per key
+    return {key: get(key) for key in REQUIRED_KEYS}
 
 def format_title(title):
     return f"{title.strip()} | Trinity Catholic Media" if title else DEFAULT_TITLE
 
 def format_description(verse_malayalam, verse_english):
     if not verse_malayalam or not verse_english:
-        st.warning("Bible verse information is missing in the response.")
         return DEFAULT_DESCRIPTION
     return f"{verse_malayalam.strip()}\n\nEnglish: {verse_english.strip()}" + WHATSAPP_LINK
 
+def description_views(description: str) -> dict:
+    # Recovers the display views from an edited description, split as the Content tab shows it.
+    return {
+        "malayalam": description.split("\n\nEnglish:")[0] if "English:" in description else "Not extracted",
+        "english": description.split("English: ")[1].split("\n\n")[0] if "English: " in description else "Not available",
+    }
+
 def format_alt_text(alt_text):
     return alt_text.strip() if alt_text else ""
 
+@st.cache_data(max_entries=32, show_spinner=False)
 def parse_and_format_gemini_output(output_str: str):
     if not output_str:
-        return {}
-    cleaned_str = clean_json_string(output_str)
-    parsed_data = parse_json_safely(cleaned_str, output_str)
+        return False, "Empty response from Gemini.", {}
+    cleaned_bytes = clean_json_string(output_str)
+    parsed_data, error = parse_json_safely(cleaned_bytes, output_str)
     if not parsed_data:
-        return {}
+        return False, error or "Gemini response contained no data.", {}
     data = ensure_required_fields(parsed_data)
     try:
-        return {
+        verse_malayalam = data.get("extracted_bible_verse_malayalam")
+        verse_english = data.get("bible_verse_english_translation")
+        formatted = {
             "title": format_title(data.get("title")),
-            "description": format_description(
-                data.get("extracted_bible_verse_malayalam"),
-                data.get("bible_verse_english_translation")
-            ),
+            "description": format_description(verse_malayalam, verse_english),
             "alt_text": format_alt_text(data.get("alternative_text_for_main_content")),
             "confidence_level": data.get("confidence_level", "low").lower(),
         }
+        # Display-only views for the Content tab, derived once from the parsed fields.
+        views = {
+            "malayalam": verse_malayalam.strip() if verse_malayalam else "Not extracted",
+            "english": verse_english.strip() if verse_english else "Not available",
+        }
+        return True, formatted, views
     except Exception as e:
-        st.error(f"Error formatting output: {e}")
-        return {}
+        return False, f"Error formatting output: {e}", {}
 
 # --- Pinterest Upload ---
-def upload_to_pinterest(image_path: str, formatted_data: dict, access_token: str, board_id: str) -> bool:
-    required_fields = ["title", "description", "alt_text"]
-    if not all(formatted_data.get(field) for field in required_fields):
-        st.error("Missing required fields for Pinterest upload")
-        return False
+UPLOAD_POLL_INTERVAL = 0.5  # seconds between reruns while an upload is pending
+# Stands in for the image in the serialized payload; the base64 bytes are spliced in afterwards.
+IMAGE_DATA_PLACEHOLDER = "__image_base64__"
+
+@st.cache_resource(show_spinner=False)
+def get_upload_executor() -> ThreadPoolExecutor:
+    # Uploads run off the script thread so the UI keeps rendering while the POST is in flight.
+    # One pool shared across reruns; a module-level one would be recreated on every poll.
+    return ThreadPoolExecutor(max_workers=2)
+
+def build_pin_body(payload: dict, image_base64) -> bytes:
+    # Base64 output is plain ASCII that needs no JSON escaping, so it can be written
+    # into the body as-is instead of being decoded to str and scanned by the serializer.
+    encoded = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode()
+    head, _, tail = encoded.partition(json.dumps(IMAGE_DATA_PLACEHOLDER).encode())
+    return b"".join((head, b'"', image_base64, b'"', tail))
+
+@st.cache_resource(show_spinner=False)
+def get_pin_session() -> requests.Session:
+    # Shared session: pooled keep-alive connections plus exponential backoff on 429/5xx.
+    # Cached as a resource so the pool outlives reruns instead of being rebuilt each time.
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["POST"],
+            raise_on_status=False,  # hand the final response back so its status is reported
+        ),
+    ))
+    return session
+
+def encode_image_base64(image_bytes: bytes) -> bytes:
+    return base64.b64encode(image_bytes)
+
+B64_CACHE_SIZE = 3
+
+@st.cache_resource(show_spinner=False)
+def get_b64_cache():
+    # Small LRU of encoded images so a retried upload skips re-encoding; shared by upload
+    # workers. Held as a resource because module globals are rebuilt on every rerun.
+    return OrderedDict(), threading.Lock()
+
+def get_image_base64(image_bytes: bytes) -> bytes:
+    cache, lock = get_b64_cache()
+    key = hashlib.blake2b(image_bytes, digest_size=16).digest()
+    with lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    encoded = encode_image_base64(image_bytes)
+    with lock:
+        cache[key] = encoded
+        cache.move_to_end(key)
+        while len(cache) > B64_CACHE_SIZE:
+            cache.popitem(last=False)
+    return encoded
+
+def upload_to_pinterest(image_bytes: bytes, content_type: str, formatted_data: dict, access_token: str, board_id: str):
+    # Runs on a worker thread, so it returns (ok, response_json_or_message) instead of calling st.*
+    if not (formatted_data.get("title") and formatted_data.get("description") and formatted_data.get("alt_text")):
+        return False, "Missing required fields for Pinterest upload"
     link = os.getenv("WHATSAPP_LINK", "https://whatsapp.com/channel/0029VbAhLis0rGiVQd0HSw03")
     try:
-        with open(image_path, "rb") as img_file:
-            image_base64 = base64.b64encode(img_file.read()).decode("utf-8")
+        image_base64 = get_image_base64(image_bytes)
     except Exception as e:
-        st.error(f"Error reading image for base64 upload: {e}")
-        return False
+        return False, f"Error reading image for base64 upload: {e}"
     headers = {
         'Authorization': f'Bearer {access_token}',
         'Content-Type': 'application/json',
@@ -149,8 +252,8 @@ def upload_to_pinterest(image_path: str, formatted_data: dict, access_token: str
         'board_id': board_id,
         'media_source': {
             'source_type': 'image_base64',
-            'content_type': 'image/jpeg',
-            'data': image_base64,
+            'content_type': content_type,
+            'data': IMAGE_DATA_PLACEHOLDER,
         },
         'title': formatted_data["title"],
         'description': formatted_data["description"],
@@ -158,21 +261,17 @@ def upload_to_pinterest(image_path: str, formatted_data: dict, access_token: str
         'alt_text': formatted_data["alt_text"],
     }
     try:
-        response = requests.post(
+        response = get_pin_session().post(
             'https://api.pinterest.com/v5/pins',
             headers=headers,
-            data=json.dumps(payload)
+            data=build_pin_body(payload, image_base64),
+            timeout=(3.05, 27),  # bounded, so the polled upload future always resolves
         )
         if response.ok:
-            st.success('Pin created successfully!')
-            st.json(response.json())
-            return True
-        else:
-            st.error(f'Failed to create pin: {response.status_code} {response.text}')
-            return False
+            return True, response.json()
+        return False, f'Failed to create pin: {response.status_code} {response.text}'
     except Exception as e:
-        st.error(f"Pinterest upload error: {str(e)}")
-        return False
+        return False, f"Pinterest upload error: {str(e)}"
 
 # --- Streamlit UI ---
 def main():
@@ -229,13 +328,16 @@ def main():
             help="Upload an image containing Malayalam Bible verse text"
         )        # Image preview in col1 (small) - split into sub-columns
         image = None
-        image_path = None
 
         if uploaded_file:
-            image = Image.open(uploaded_file)
-            # Save to disk for processing
-            image_path = Path("uploaded_image.jpg")
-            image.save(image_path)
+            raw_bytes = uploaded_file.getvalue()
+            image_digest = hashlib.blake2b(raw_bytes, digest_size=8).digest()
+            if st.session_state.get("image_digest") != image_digest:
+                # New upload: Gemini and the Pinterest upload both use these in-memory bytes
+                st.session_state["image_digest"] = image_digest
+                st.session_state["image_bytes"] = raw_bytes
+                st.session_state["image_type"] = uploaded_file.type or "image/jpeg"
+            image = Image.open(io.BytesIO(raw_bytes))
               # Create sub-columns within col1
             preview_col, info_col = st.columns([1, 1])
             
@@ -248,7 +350,7 @@ def main():
                 st.write(f"**Format:** {image.format}")
                 st.write(f"**Size:** {image.size[0]} x {image.size[1]}")
                 # Add file size info
-                file_size = len(uploaded_file.getvalue()) / 1024  # KB
+                file_size = len(raw_bytes) / 1024  # KB
                 if file_size > 1024:
                     st.write(f"**File Size:** {file_size/1024:.1f} MB")
                 else:
@@ -261,7 +363,7 @@ def main():
                     st.error("⚠️ Please enter a valid Gemini API key.")
                 # elif not pinterest_token or not board_id:
                 #     st.error("⚠️ Please enter Pinterest credentials.")
-                elif not image_path or not validate_image_path(image_path):
+                elif "image_bytes" not in st.session_state:
                     st.error("⚠️ Image not available for processing.")
                 else:
                     # Processing workflow with progress bar
@@ -269,15 +371,10 @@ def main():
                     status_text = st.empty()
                     
                     try:
-                        # Step 1: Configure Gemini
-                        status_text.text("🔧 Configuring Gemini AI...")
-                        progress_bar.progress(20)
-                        configure_genai(api_key)
-                        
-                        # Step 2: Load model
+                        # Step 1-2: Configure Gemini and load model (cached across reruns)
                         status_text.text("🤖 Loading AI model...")
                         progress_bar.progress(40)
-                        model = get_gemini_model(Config.GEMINI_MODEL_NAME)
+                        model = get_gemini_model(api_key, Config.GEMINI_MODEL_NAME)
                         if not model:
                             st.error("❌ Failed to load AI model.")
                             st.stop()
@@ -285,57 +382,48 @@ def main():
                         # Step 3: Prepare image
                         status_text.text("🖼️ Preparing image...")
                         progress_bar.progress(60)
-                        img_for_gemini = load_image(image_path)
-                        if not img_for_gemini:
-                            st.error("❌ Failed to load image.")
-                            st.stop()
+                        image_part = build_image_part(
+                            st.session_state["image_bytes"], st.session_state["image_type"]
+                        )
 
                         # Step 4: Generate content
                         status_text.text("🧠 Analyzing image with AI...")
                         progress_bar.progress(80)
                         
-                        prompt = """
-                        Analyze this image and:
-                        1. Identify if it contains Malayalam text (bible verse)
-                        2. If Malayalam text is present, extract it and provide English translation
-                        3. If no Malayalam text or unreadable, state that clearly
-                        4. Title should be the bible verse reference
-                        5. Provide alternative text for the main content (strictly exclude logo details) if applicable
-
-                        Respond in this JSON format:
-                        {
-                            "contains_malayalam": boolean,
-                            "title": "string or null",
-                            "extracted_bible_verse_malayalam": "string or null",
-                            "bible_verse_english_translation": "string or null",
-                            "alternative_text_for_main_content": "string or null",
-                            "confidence_level": "low/medium/high",
-                            "notes": "any additional observations"
-                        }
-                        """
+                        prompt = GEMINI_PROMPT
                         
                         # Custom spinner for Gemini call
                         with st.spinner("🤖 AI is analyzing your image..."):
-                            response = model.generate_content([prompt, img_for_gemini])
+                            response_text = cached_gemini_infer(
+                                st.session_state["image_digest"],
+                                prompt,
+                                Config.GEMINI_MODEL_NAME,
+                                api_key,
+                                image_part,
+                            )
                         
                         progress_bar.progress(90)
                         status_text.text("📝 Processing results...")
                         
                         # Display raw response in expander
                         with st.expander("🔍 View Raw AI Response"):
-                            st.code(response.text, language="json")
+                            st.code(response_text, language="json")
 
                         # Step 5: Format response
-                        formatted_data = parse_and_format_gemini_output(response.text)
-                        if not formatted_data:
+                        ok, formatted_data, views = parse_and_format_gemini_output(response_text)
+                        if not ok:
+                            st.error(formatted_data)
                             st.error("❌ Could not format AI response.")
                             st.stop()
+                        if formatted_data["description"] == DEFAULT_DESCRIPTION:
+                            st.warning("Bible verse information is missing in the response.")
 
                         progress_bar.progress(100)
                         status_text.text("✅ Processing complete!")
                         
                         # Store in session state
                         st.session_state.processed_data = formatted_data
+                        st.session_state["views"] = views
                         st.session_state.processing_complete = True
                           # Clear progress indicators
                         progress_bar.empty()
@@ -366,17 +454,16 @@ def main():
             
             with tab1:
                 data = st.session_state.processed_data
+                views = st.session_state.get("views", {})
                 
                 subcol1, subcol2 = st.columns(2)
                 with subcol1:
                     st.markdown("**📖 Malayalam Verse:**")
-                    malayalam_text = data.get('description', '').split('\n\nEnglish:')[0] if 'English:' in data.get('description', '') else "Not extracted"
-                    st.write(malayalam_text)
+                    st.write(views.get("malayalam", "Not extracted"))
                     
                 with subcol2:
                     st.markdown("**🔤 English Translation:**")
-                    english_text = data.get('description', '').split('English: ')[1].split('\n\n')[0] if 'English: ' in data.get('description', '') else "Not available"
-                    st.write(english_text)
+                    st.write(views.get("english", "Not available"))
                 
                 st.markdown("**📄 Alt Text:**")
                 st.write(data.get('alt_text', 'Not available'))
@@ -429,6 +516,7 @@ def main():
                                 'description': edited_description,
                                 'alt_text': edited_alt_text
                             })
+                            st.session_state["views"] = description_views(edited_description)
                             st.session_state.data_edited = True
                             st.success("✅ Changes saved successfully!")
                             st.rerun()
@@ -448,9 +536,17 @@ def main():
                 
                 # Data validation check
                 data = st.session_state.processed_data
-                title_valid = bool(data.get('title', '').strip())
-                desc_valid = bool(data.get('description', '').strip())
-                alt_valid = bool(data.get('alt_text', '').strip())
+                # Recompute only when the content changes; all values are strings,
+                # whose hashes CPython caches, so the signature is cheap per rerun.
+                data_sig = hash(tuple(sorted(data.items())))
+                if st.session_state.get("_data_sig") != data_sig:
+                    st.session_state["validity"] = (
+                        bool(data.get('title', '').strip()),
+                        bool(data.get('description', '').strip()),
+                        bool(data.get('alt_text', '').strip()),
+                    )
+                    st.session_state["_data_sig"] = data_sig
+                title_valid, desc_valid, alt_valid = st.session_state["validity"]
                 
                 col1_summary, col2_summary = st.columns([1, 1])
                 
@@ -477,25 +573,39 @@ def main():
                 # Upload button with validation
                 all_data_valid = title_valid and desc_valid and alt_valid
                 
-                if confidence in ["high", "medium"] and all_data_valid:
+                upload_future = st.session_state.get("upload_future")
+                if upload_future is not None:
+                    if not upload_future.done():
+                        with st.status("📤 Uploading to Pinterest...", state="running"):
+                            st.write("Waiting for Pinterest to respond...")
+                        time.sleep(UPLOAD_POLL_INTERVAL)
+                        st.rerun()
+                    st.session_state.upload_future = None
+                    success, result = upload_future.result()
+                    if success:
+                        st.success('Pin created successfully!')
+                        st.json(result)
+                        st.balloons()
+                        st.success("🎉 Successfully posted to Pinterest!")
+                        # Reset session state after successful upload
+                        st.session_state.processed_data = None
+                        st.session_state.processing_complete = False
+                    else:
+                        st.error(result)
+                elif confidence in ["high", "medium"] and all_data_valid:
                     if st.button("📌 Upload to Pinterest", key="upload_pinterest", type="primary", use_container_width=True):
                         if not pinterest_token or not board_id:
                             st.error("⚠️ Please enter Pinterest credentials in the sidebar.")
                         else:
-                            with st.spinner("📤 Uploading to Pinterest..."):
-                                success = upload_to_pinterest(
-                                    str(image_path), 
-                                    st.session_state.processed_data, 
-                                    pinterest_token, 
-                                    board_id
-                                )
-                            
-                            if success:
-                                st.balloons()
-                                st.success("🎉 Successfully posted to Pinterest!")
-                                # Reset session state after successful upload
-                                st.session_state.processed_data = None
-                                st.session_state.processing_complete = False
+                            st.session_state.upload_future = get_upload_executor().submit(
+                                upload_to_pinterest,
+                                st.session_state["image_bytes"],
+                                st.session_state["image_type"],
+                                dict(st.session_state.processed_data),
+                                pinterest_token,
+                                board_id
+                            )
+                            st.rerun()
                 elif not all_data_valid:
                     st.error("❌ Upload disabled: Please ensure all Pinterest data fields are filled.")
                     st.info("💡 Go to the '🎯 Pinterest Data' tab to complete missing information.")
@@ -1,13 +1,39 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import contextlib
+import functools
+import hashlib
+import io
 import json
+import logging
+import mimetypes
 import os
+import re
+import stat
+import sys
+import textwrap
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Any, Dict, Final, List, Optional, Tuple, Union
 
-import google.generativeai as genai
 import requests
 from dotenv import load_dotenv
-from PIL import Image
-from pydantic import BaseModel, ValidationError, field_validator, model_validator
+from PIL import Image, ImageOps
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional C-accelerated JSON, fall back to stdlib
+    orjson = None
+
+if TYPE_CHECKING:
+    # google.generativeai pulls in grpc/protobuf; it is imported lazily at runtime.
+    import google.generativeai as genai
+
+log = logging.getLogger("img2txt")
 
 # --- Constants ---
 DEFAULT_TITLE = "Trinity Catholic Media"
@@ -19,114 +45,193 @@ WHATSAPP_LINK = (
     "\n\nStay inspired daily! Follow our WhatsApp channel for the latest Bible verses: "
     "https://whatsapp.com/channel/0029VbAhLis0rGiVQd0HSw03"
 )
-REQUIRED_KEYS = [
-    "title",
-    "extracted_bible_verse_malayalam",
-    "bible_verse_english_translation",
-    "alternative_text_for_main_content",
-    "confidence_level",
-]
+DESCRIPTION_TEMPLATE = "{malayalam}\n\nEnglish: {english}" + WHATSAPP_LINK
+# Dedented once at import so the indentation is not sent to Gemini as prompt tokens.
+PROMPT: Final[str] = textwrap.dedent("""
+    Analyze this image and:
+    1. Identify if it contains Malayalam text (bible verse)
+    2. If Malayalam text is present, extract it and provide English translation
+    3. If no Malayalam text or unreadable, state that clearly
+    4. Title should be the bible verse reference
+    5. Provide alternative text for the main content (strictly exclude logo details) if applicable
+
+    Respond in this JSON format:
+    {
+        "contains_malayalam": boolean,
+        "title": "string or null",
+        "extracted_bible_verse_malayalam": "string or null",
+        "bible_verse_english_translation": "string or null",
+        "alternative_text_for_main_content": "string or null",
+        "confidence_level": "low/medium/high",
+        "notes": "any additional observations"
+    }
+    """).strip()
+LOW_CONFIDENCE_PATTERN = re.compile(r'"confidence_level"\s*:\s*"low"', re.IGNORECASE)
+# Characters of earlier output rescanned with each chunk so a match split across chunks is found.
+LOW_CONFIDENCE_OVERLAP = 64
+_NULLABLE_STRING = {"type": "STRING", "nullable": True}
+# Structured output: Gemini returns bare JSON matching this schema (no fences or prose).
+GENERATION_CONFIG: Final[Dict[str, Any]] = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {
+            "contains_malayalam": {"type": "BOOLEAN"},
+            "title": _NULLABLE_STRING,
+            "extracted_bible_verse_malayalam": _NULLABLE_STRING,
+            "bible_verse_english_translation": _NULLABLE_STRING,
+            "alternative_text_for_main_content": _NULLABLE_STRING,
+            "confidence_level": {"type": "STRING", "enum": ["low", "medium", "high"]},
+            "notes": _NULLABLE_STRING,
+        },
+        "required": [
+            "contains_malayalam",
+            "title",
+            "extracted_bible_verse_malayalam",
+            "bible_verse_english_translation",
+            "alternative_text_for_main_content",
+            "confidence_level",
+        ],
+    },
+}
 
 
 class Config:
     DEFAULT_IMAGE_PATH = "tst.jpg"
     GEMINI_MODEL_NAME = "gemini-2.5-flash-preview-05-20"
     DEFAULT_TAGS = ["bible quotes"]
+    CACHE_DIR = ".cache"
+    ABORT_ON_LOW_CONFIDENCE = True
+    UPLOAD_JPEG_QUALITY = 85
+    MAX_CONCURRENT_REQUESTS = 8
+    MAX_CONCURRENT_UPLOADS = 4
+
+
+@dataclass(frozen=True, slots=True)
+class Secrets:
+    """Credentials and links read once from the environment."""
+    gemini_api_key: Optional[str]
+    pinterest_access_token: Optional[str]
+    pinterest_board_id: Optional[str]
+    whatsapp_link: str
+
+    @classmethod
+    @functools.cache
+    def load(cls) -> "Secrets":
+        """Snapshot the environment on first use; call after load_dotenv()."""
+        return cls(
+            gemini_api_key=os.environ.get("GEMINI_API_KEY"),
+            pinterest_access_token=os.environ.get("PINTEREST_ACCESS_TOKEN"),
+            pinterest_board_id=os.environ.get("PINTEREST_BOARD_ID"),
+            whatsapp_link=os.environ.get(
+                "WHATSAPP_LINK", "https://whatsapp.com/channel/0029VbAhLis0rGiVQd0HSw03"
+            ),
+        )
 
 
 # --- Validators ---
 def validate_image_path(image_path: Path) -> bool:
     """Validate that the image file exists and is accessible."""
     if not image_path.exists():
-        print(f"Error: Image file not found at '{image_path}'")
-        print("Please update 'image_file_path' or ensure the image is in the same directory.")
+        log.error("Image file not found at '%s'", image_path)
+        log.error("Please update 'image_file_path' or ensure the image is in the same directory.")
         return False
     return True
 
 
-def validate_api_key() -> Optional[str]:
-    """Validate and return the Gemini API key from environment variables."""
-    if api_key := os.environ.get("GEMINI_API_KEY"):
+def validate_api_key(secrets: Secrets) -> Optional[str]:
+    """Validate and return the Gemini API key from the environment snapshot."""
+    if api_key := secrets.gemini_api_key:
         return api_key
     
-    print("Error: GEMINI_API_KEY environment variable not set.")
-    print("Please obtain your Gemini API key from Google AI Studio (https://aistudio.google.com/app/apikey)")
-    print("Example: export GEMINI_API_KEY='your_api_key_here'")
+    log.error("GEMINI_API_KEY environment variable not set.")
+    log.error("Please obtain your Gemini API key from Google AI Studio (https://aistudio.google.com/app/apikey)")
+    log.error("Example: export GEMINI_API_KEY='your_api_key_here'")
     return None
 
 
-# --- Image Loader ---
-def load_image(image_path: Path) -> Optional[Image.Image]:
-    """Load an image from the given path."""
-    try:
-        return Image.open(image_path)
-    except Exception as e:
-        print(f"Error opening image: {e}")
-        return None
-
-
 # --- Gemini API ---
+@functools.cache
 def configure_genai(api_key: str) -> None:
-    """Configure the Gemini API with the provided key."""
+    """Configure the Gemini API with the provided key, once per key."""
+    import google.generativeai as genai
+
     genai.configure(api_key=api_key)
 
 
+def get_image_mime_type(image_path: Path) -> str:
+    """Return the MIME type Gemini should be told for an image file."""
+    return mimetypes.guess_type(image_path.name)[0] or "image/jpeg"
+
+
+@functools.lru_cache(maxsize=4)
+def build_gemini_model(model_name: str) -> genai.GenerativeModel:
+    """Build a Gemini model instance, reusing one already built for the same name."""
+    import google.generativeai as genai
+
+    return genai.GenerativeModel(model_name)
+
+
 def get_gemini_model(model_name: str) -> Optional[genai.GenerativeModel]:
     """Initialize and return a Gemini model instance."""
     try:
-        return genai.GenerativeModel(model_name)
+        return build_gemini_model(model_name)
     except Exception as e:
-        print(f"Error: Could not load model '{model_name}'. Please check the model name.")
-        print(f"Details: {e}")
+        log.error("Could not load model '%s'. Please check the model name.", model_name)
+        log.error("Details: %s", e)
         return None
 
 
-def generate_gemini_content(
+async def generate_gemini_content(
     model: genai.GenerativeModel, 
     prompt: str, 
-    image: Image.Image
+    image_bytes: bytes,
+    mime_type: str
 ) -> Optional[str]:
-    """Generate content from Gemini using the given prompt and image."""
+    """Generate content from Gemini using the given prompt and encoded image bytes."""
+    # Inline data sends the file as-is: no local decode and no SDK re-encode.
+    image = {"mime_type": mime_type, "data": image_bytes}
+    contents = [prompt, image]
     try:
-        print("\n--- Sending request to Gemini... ---")
-        response = model.generate_content([prompt, image])
-        print("\n--- Gemini's Response ---")
-        print(response.text)
-        return response.text
+        log.info("--- Sending request to Gemini... ---")
+        response = await model.generate_content_async(
+            contents, generation_config=GENERATION_CONFIG, stream=True
+        )
+        chunks: List[str] = []
+        tail = ""
+        # aclosing() shuts the stream down explicitly when we stop reading early.
+        async with contextlib.aclosing(aiter(response)) as stream:
+            async for chunk in stream:
+                piece = chunk.text
+                chunks.append(piece)
+                if Config.ABORT_ON_LOW_CONFIDENCE:
+                    # Only the new chunk plus a short overlap is scanned, not the whole text.
+                    window = tail + piece
+                    if LOW_CONFIDENCE_PATTERN.search(window):
+                        log.warning("Gemini reported low confidence, stopping early.")
+                        return None
+                    tail = window[-LOW_CONFIDENCE_OVERLAP:]
+        text = "".join(chunks)
+        log.info("--- Gemini's Response ---\n%s", text)
+        return text
     except Exception as e:
-        print(f"\nError during Gemini API call: {e}")
-        print("Possible issues: API key, rate limits, or network problems.")
+        log.error("Error during Gemini API call: %s", e)
+        log.error("Possible issues: API key, rate limits, or network problems.")
         return None
 
 
 # --- Formatter ---
-def clean_json_string(json_str: str) -> str:
-    """Clean and prepare a JSON string for parsing."""
-    cleaned = json_str.strip()
-    for marker in ["```json", "```"]:
-        if cleaned.startswith(marker):
-            cleaned = cleaned[len(marker):]
-        if cleaned.endswith(marker):
-            cleaned = cleaned[:-len(marker)]
-    cleaned = cleaned.strip()
-    cleaned = cleaned.replace(",\n}", "\n}").replace(",\n]", "\n]")
-    return cleaned
-
-
-def parse_json_safely(json_str: str, original_str: str) -> Optional[Dict[str, Any]]:
+def parse_json_safely(json_str: str) -> Optional[Dict[str, Any]]:
     """Safely parse a JSON string with error handling."""
     try:
+        if orjson is not None:
+            return orjson.loads(json_str)  # accepts str directly, no encode copy needed
         return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        print(f"Error parsing JSON: {e}\nRaw output was:\n{original_str}")
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses this
+        log.error("Error parsing JSON: %s\nRaw output was:\n%s", e, json_str)
         return None
 
 
-def ensure_required_fields(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Ensure all required fields are present in the data dictionary."""
-    return {key: data.get(key) for key in REQUIRED_KEYS} if isinstance(data, dict) else {}
-
-
 def format_title(title: Optional[str]) -> str:
     """Format the title with fallback to default if missing."""
     return f"{title.strip()} | Trinity Catholic Media" if title else DEFAULT_TITLE
@@ -135,9 +240,11 @@ def format_title(title: Optional[str]) -> str:
 def format_description(verse_malayalam: Optional[str], verse_english: Optional[str]) -> str:
     """Format the description with fallback to default if missing."""
     if not verse_malayalam or not verse_english:
-        print("Warning: Bible verse information is missing in the response.")
+        log.warning("Bible verse information is missing in the response.")
         return DEFAULT_DESCRIPTION
-    return f"{verse_malayalam.strip()}\n\nEnglish: {verse_english.strip()}{WHATSAPP_LINK}"
+    return DESCRIPTION_TEMPLATE.format_map(
+        {"malayalam": verse_malayalam.strip(), "english": verse_english.strip()}
+    )
 
 
 def format_alt_text(alt_text: Optional[str]) -> str:
@@ -150,98 +257,173 @@ def parse_and_format_gemini_output(output_str: str) -> Dict[str, Any]:
     if not output_str:
         return {}
     
-    cleaned_str = clean_json_string(output_str)
-    if not (parsed_data := parse_json_safely(cleaned_str, output_str)):
+    if not (parsed_data := parse_json_safely(output_str)):
         return {}
-    
-    data = ensure_required_fields(parsed_data)
+    if not isinstance(parsed_data, dict):
+        log.error("Expected a JSON object, got %s", type(parsed_data).__name__)
+        return {}
+
+    g = parsed_data.get
     try:
         return {
-            "title": format_title(data.get("title")),
+            "title": format_title(g("title")),
             "description": format_description(
-                data.get("extracted_bible_verse_malayalam"),
-                data.get("bible_verse_english_translation")
+                g("extracted_bible_verse_malayalam"),
+                g("bible_verse_english_translation")
             ),
-            "alt_text": format_alt_text(data.get("alternative_text_for_main_content")),
-            "confidence_level": data.get("confidence_level", "low").lower(),
+            "alt_text": format_alt_text(g("alternative_text_for_main_content")),
+            "confidence_level": (g("confidence_level") or "low").lower(),
         }
     except Exception as e:
-        print(f"Error formatting output: {e}")
+        log.error("Error formatting output: %s", e)
         return {}
 
 
-# --- Pinterest API with Pydantic ---
-class PinData(BaseModel):
-    """Pydantic model for Pinterest pin data validation."""
+# --- Pinterest API ---
+PIN_TEXT_FIELDS = ("board_id", "title", "description", "alt_text", "access_token")
+
+# Shared session: pooled keep-alive connections plus exponential backoff on 429/5xx.
+PINTEREST_SESSION = requests.Session()
+PINTEREST_SESSION.headers.update({"User-Agent": "img2txt/1.0"})
+PINTEREST_SESSION.mount("https://", HTTPAdapter(
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,  # hand the final response back so its status is reported
+    ),
+))
+
+
+@functools.lru_cache(maxsize=1024)
+def check_image_file(image_path: str) -> Optional[str]:
+    """Return an error message if the image path is not a readable file."""
+    try:
+        st = os.stat(image_path)
+    except FileNotFoundError:
+        return f"Image file not found: {image_path}"
+    except OSError as e:
+        return f"Cannot access image file: {image_path} ({e})"
+    if not stat.S_ISREG(st.st_mode):
+        return f"Path is not a file: {image_path}"
+    # Coarse mode-bit check; the upload's open() reports any remaining permission error.
+    if not st.st_mode & (stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH):
+        return f"Cannot read image file: {image_path}"
+    return None
+
+
+def validate_pin_data(pin: "PinData") -> None:
+    """Validate and normalize Pinterest pin data, raising ValueError on failure."""
+    for name in PIN_TEXT_FIELDS:
+        value = getattr(pin, name)
+        if not value or not value.strip():
+            raise ValueError(f"{name}: Field cannot be empty")
+        object.__setattr__(pin, name, value.strip())
+
+    if error := check_image_file(pin.image_path):
+        raise ValueError(f"image_path: {error}")
+
+    if pin.tags:
+        if len(pin.tags) > 20:
+            raise ValueError("tags: Too many tags (max 20)")
+        tags = [tag.strip() for tag in pin.tags]
+        if not all(tags):
+            raise ValueError("tags: Tags cannot be empty strings")
+        object.__setattr__(pin, "tags", tags)
+
+
+@dataclass(slots=True, frozen=True)
+class PinData:
+    """Pinterest pin data, validated on construction."""
     board_id: str
     image_path: str
     title: str
     description: str
     alt_text: str
-    tags: Optional[List[str]] = None
     access_token: str
-
-    @field_validator("image_path")
-    def validate_image_path(cls, v: str) -> str:
-        """Validate that the image path exists and is readable."""
-        path = Path(v)
-        if not path.exists():
-            raise ValueError(f"Image file not found: {v}")
-        if not path.is_file():
-            raise ValueError(f"Path is not a file: {v}")
-        if not os.access(v, os.R_OK):
-            raise ValueError(f"Cannot read image file: {v}")
-        return v
-
-    @field_validator("board_id", "title", "description", "alt_text", "access_token")
-    def validate_not_empty(cls, v: str) -> str:
-        """Validate that required fields are not empty."""
-        if not v or not v.strip():
-            raise ValueError("Field cannot be empty")
-        return v.strip()
-
-    @model_validator(mode="after")
-    def validate_tags_content(self) -> "PinData":
-        """Validate tags content if present."""
-        if self.tags:
-            if len(self.tags) > 20:
-                raise ValueError("Too many tags (max 20)")
-            if any(not tag.strip() for tag in self.tags):
-                raise ValueError("Tags cannot be empty strings")
-        return self
+    tags: Optional[List[str]] = None
+    link: Optional[str] = None
+    # Bytes already read by the caller; the upload reads image_path only when absent.
+    image_bytes: Optional[bytes] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        validate_pin_data(self)
+
+
+def encode_upload_image(original: bytes) -> bytes:
+    """Re-encode image bytes as an optimized progressive JPEG for upload."""
+    buffer = io.BytesIO()
+    with Image.open(io.BytesIO(original)) as img:
+        is_jpeg = img.format == "JPEG"
+        icc_profile = img.info.get("icc_profile")
+        # Bake in the EXIF rotation, since the re-encoded file carries no EXIF.
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            # Flatten transparency onto white; a bare convert("RGB") turns it black.
+            rgba = img.convert("RGBA")
+            rgb = Image.new("RGB", rgba.size, (255, 255, 255))
+            rgb.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            rgb = img.convert("RGB")
+        rgb.save(
+            buffer,
+            format="JPEG",
+            quality=Config.UPLOAD_JPEG_QUALITY,
+            optimize=True,
+            progressive=True,
+            icc_profile=icc_profile,
+        )
+    # Already well-compressed JPEGs can grow when re-encoded; keep the original then.
+    if is_jpeg and buffer.tell() >= len(original):
+        return original
+    return buffer.getvalue()
 
 
 def upload_pin(pin_data: PinData) -> Optional[Dict[str, Any]]:
     """Upload a pin to Pinterest using the provided data."""
     url = "https://api.pinterest.com/v5/pins"
-    headers = {"Authorization": f"Bearer {pin_data.access_token}"}
+    headers = {
+        "Authorization": f"Bearer {pin_data.access_token}",
+        "Content-Type": "application/json",
+    }
 
     try:
-        with open(pin_data.image_path, "rb") as image_file:
-            files = {"image": image_file}
-            data = {
-                "board_id": pin_data.board_id,
-                "title": pin_data.title,
-                "description": pin_data.description,
-                "alt_text": pin_data.alt_text,
-            }
-            if pin_data.tags:
-                data["tags"] = json.dumps([tag.strip() for tag in pin_data.tags])
-
-            response = requests.post(
-                url, headers=headers, files=files, data=data, timeout=(3.05, 27)
-            )
-            response.raise_for_status()
-            return response.json()
+        original = pin_data.image_bytes
+        if original is None:
+            original = Path(pin_data.image_path).read_bytes()
+        payload = {
+            "board_id": pin_data.board_id,
+            # POST /v5/pins takes the image inline as base64 JSON, not as a multipart file.
+            "media_source": {
+                "source_type": "image_base64",
+                "content_type": "image/jpeg",
+                "data": base64.b64encode(encode_upload_image(original)).decode("ascii"),
+            },
+            "title": pin_data.title,
+            "description": pin_data.description,
+            "alt_text": pin_data.alt_text,
+        }
+        if pin_data.link:
+            payload["link"] = pin_data.link
+
+        # A materialized body (not a one-shot stream) so the adapter can replay it on retry.
+        body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode()
+        response = PINTEREST_SESSION.post(url, headers=headers, data=body, timeout=(3.05, 27))
+        response.raise_for_status()
+        return response.json()
     except requests.exceptions.RequestException as e:
         error_msg = f"Error uploading pin: {str(e)}"
         if e.response is not None:
             try:
                 error_detail = e.response.json().get("message", e.response.text)
-                print(f"API Response: {error_detail}")
+                log.error("API Response: %s", error_detail)
             except ValueError:
-                print(f"API Response: {e.response.text}")
-        print(error_msg)
+                log.error("API Response: %s", e.response.text)
+        log.error(error_msg)
+        return None
+    except OSError as e:
+        log.error("Error preparing image for upload: %s", e)
         return None
 
 
@@ -253,6 +435,8 @@ def create_pin(
     alt_text: str,
     tags: Optional[List[str]] = None,
     access_token: Optional[str] = None,
+    link: Optional[str] = None,
+    image_bytes: Optional[bytes] = None,
 ) -> Optional[Dict[str, Any]]:
     """Create and upload a pin to Pinterest with validation."""
     try:
@@ -263,150 +447,220 @@ def create_pin(
             description=description,
             alt_text=alt_text,
             tags=tags,
-            access_token=access_token or os.getenv("PINTEREST_ACCESS_TOKEN"),
+            access_token=access_token or Secrets.load().pinterest_access_token,
+            link=link,
+            image_bytes=image_bytes,
         )
         return upload_pin(pin_data)
-    except ValidationError as e:
-        print(f"Validation error: {e}")
+    except ValueError as e:
+        log.error("Validation error: %s", e)
         return None
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        log.error("Unexpected error: %s", e)
         return None
 
 
-# --- Main Workflow ---
-def get_prompt() -> str:
-    """Return the standardized prompt for Gemini."""
-    return """
-    Analyze this image and:
-    1. Identify if it contains Malayalam text (bible verse)
-    2. If Malayalam text is present, extract it and provide English translation
-    3. If no Malayalam text or unreadable, state that clearly
-    4. Title should be the bible verse reference
-    5. Provide alternative text for the main content (strictly exclude logo details) if applicable
+# --- Response Cache ---
+def get_cache_path(image_bytes: bytes, prompt: str) -> Path:
+    """Return the cache file path for an image and prompt pair."""
+    image_digest = hashlib.sha256(image_bytes).hexdigest()
+    key = hashlib.sha256(image_digest.encode() + prompt.encode()).hexdigest()
+    return Path(Config.CACHE_DIR) / f"{key}.json"
 
-    Respond in this JSON format:
-    {
-        "contains_malayalam": boolean,
-        "title": "string or null",
-        "extracted_bible_verse_malayalam": "string or null",
-        "bible_verse_english_translation": "string or null",
-        "alternative_text_for_main_content": "string or null",
-        "confidence_level": "low/medium/high",
-        "notes": "any additional observations"
-    }
-    """
+
+def load_cached_response(cache_path: Path) -> Optional[Dict[str, Any]]:
+    """Load a previously formatted response from the cache, if present."""
+    if not cache_path.is_file():
+        return None
+    try:
+        data = cache_path.read_bytes()
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring unreadable cache entry '%s': %s", cache_path, e)
+        return None
 
 
+def save_cached_response(cache_path: Path, formatted_data: Dict[str, Any]) -> None:
+    """Store a formatted response in the cache."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            cache_path.write_bytes(orjson.dumps(formatted_data))
+        else:
+            cache_path.write_text(json.dumps(formatted_data, ensure_ascii=False), encoding="utf-8")
+    except OSError as e:
+        log.warning("Could not write cache entry '%s': %s", cache_path, e)
+
+
+# --- Main Workflow ---
 def process_gemini_response(response: str) -> Optional[Dict[str, Any]]:
     """Process and format Gemini's response."""
     if not response:
-        print("Error: Empty response from Gemini")
+        log.error("Empty response from Gemini")
         return None
 
     formatted_data = parse_and_format_gemini_output(response)
     if not formatted_data:
-        print("Error: Could not format Gemini response.")
+        log.error("Could not format Gemini response.")
         return None
 
-    print("\n--- Formatted Response ---")
+    log.info("--- Formatted Response ---")
     for key, value in formatted_data.items():
-        print(f"{key}: {value}")
+        log.info("%s: %s", key, value)
     return formatted_data
 
 
-def upload_to_pinterest(image_path: str, formatted_data: Dict[str, Any]) -> bool:
-    """Upload formatted data to Pinterest using direct base64 image upload."""
+def upload_to_pinterest(
+    image_path: str,
+    image_bytes: bytes,
+    formatted_data: Dict[str, Any],
+    secrets: Secrets
+) -> bool:
+    """Upload formatted data to Pinterest as a base64 JSON pin via create_pin."""
     required_fields = ["title", "description", "alt_text"]
-    if not all(formatted_data.get(field) for field in required_fields):
-        print("Error: Missing required fields for Pinterest upload")
+    if not all(formatted_data.get(key) for key in required_fields):
+        log.error("Missing required fields for Pinterest upload")
         return False
 
-    access_token = os.getenv("PINTEREST_ACCESS_TOKEN")
-    board_id = os.getenv("PINTEREST_BOARD_ID")
-    title = formatted_data["title"]
-    description = formatted_data["description"]
-    alt_text = formatted_data["alt_text"]
-    link = os.getenv("WHATSAPP_LINK", "https://whatsapp.com/channel/0029VbAhLis0rGiVQd0HSw03")
-
-    # Read and encode the image file as base64
-    try:
-        with open(image_path, "rb") as img_file:
-            import base64
-            image_base64 = base64.b64encode(img_file.read()).decode("utf-8")
-    except Exception as e:
-        print(f"Error reading image for base64 upload: {e}")
+    result = create_pin(
+        board_id=secrets.pinterest_board_id,
+        image_path=image_path,
+        title=formatted_data["title"],
+        description=formatted_data["description"],
+        alt_text=formatted_data["alt_text"],
+        access_token=secrets.pinterest_access_token,
+        link=secrets.whatsapp_link,
+        image_bytes=image_bytes,
+    )
+    if result is None:
         return False
 
-    headers = {
-        'Authorization': f'Bearer {access_token}',
-        'Content-Type': 'application/json',
-    }
-    payload = {
-        'board_id': board_id,
-        'media_source': {
-            'source_type': 'image_base64',
-            'content_type': 'image/jpeg',  # Change if not JPEG
-            'data': image_base64,
-        },
-        'title': title,
-        'description': description,
-        'link': link,
-        'alt_text': alt_text,
-    }
+    log.info('Pin created successfully!')
+    log.info("%s", json.dumps(result, indent=2))
+    return True
+
+
+async def process_image(
+    model: genai.GenerativeModel,
+    prompt: str,
+    image_path: Path,
+    semaphore: asyncio.Semaphore
+) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """Load, analyze and format a single image, using the response cache when possible.
+
+    The image is read once; the returned bytes are reused for the Pinterest upload.
+    """
+    if not validate_image_path(image_path):
+        return None
+
     try:
-        response = requests.post(
-            'https://api.pinterest.com/v5/pins',
-            headers=headers,
-            data=json.dumps(payload)
+        image_bytes = await asyncio.to_thread(image_path.read_bytes)
+    except OSError as e:
+        log.error("Error reading image '%s': %s", image_path, e)
+        return None
+    cache_path = get_cache_path(image_bytes, prompt)
+    if formatted_data := load_cached_response(cache_path):
+        log.info("--- Using cached response for %s (%s) ---", image_path, cache_path.name)
+        return formatted_data, image_bytes
+
+    async with semaphore:
+        gemini_response = await generate_gemini_content(
+            model, prompt, image_bytes, get_image_mime_type(image_path)
         )
-        if response.ok:
-            print('Pin created successfully!')
-            print(json.dumps(response.json(), indent=2))
-            return True
-        else:
-            print('Failed to create pin:')
-            print(response.status_code, response.text)
-            return False
-    except Exception as e:
-        print(f"Pinterest upload error: {str(e)}")
-        return False
+    if not gemini_response:
+        return None
 
+    if not (formatted_data := process_gemini_response(gemini_response)):
+        return None
+    save_cached_response(cache_path, formatted_data)
+    return formatted_data, image_bytes
+
+
+async def process_and_upload(
+    model: genai.GenerativeModel,
+    prompt: str,
+    image_path: Path,
+    secrets: Secrets,
+    semaphore: asyncio.Semaphore,
+    upload_semaphore: asyncio.Semaphore
+) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """Analyze an image and upload it right away when Gemini is confident.
+
+    Returns the result when the upload needs user confirmation first, else None.
+    """
+    if not (result := await process_image(model, prompt, image_path, semaphore)):
+        return None
+    formatted_data, image_bytes = result
+    if formatted_data.get("confidence_level", "low") != "high":
+        return result
 
-def main() -> None:
+    # The blocking upload runs in a worker thread so other images keep analyzing.
+    async with upload_semaphore:
+        await asyncio.to_thread(
+            upload_to_pinterest, str(image_path), image_bytes, formatted_data, secrets
+        )
+    return None
+
+
+async def process_images(
+    model: genai.GenerativeModel,
+    prompt: str,
+    image_paths: List[Path],
+    secrets: Secrets
+) -> List[Union[Optional[Tuple[Dict[str, Any], bytes]], BaseException]]:
+    """Analyze and upload all images concurrently, overlapping Gemini calls with uploads.
+
+    Concurrency is bounded by Config.MAX_CONCURRENT_REQUESTS and
+    Config.MAX_CONCURRENT_UPLOADS; results still awaiting confirmation are returned.
+    A failure in one image is returned as its exception instead of cancelling the batch.
+    """
+    semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
+    upload_semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_UPLOADS)
+    return await asyncio.gather(*(
+        process_and_upload(model, prompt, path, secrets, semaphore, upload_semaphore)
+        for path in image_paths
+    ), return_exceptions=True)
+
+
+def main(image_paths: Optional[List[Path]] = None) -> None:
     """Main workflow execution."""
-    print("=== Starting Pin Creation Process ===")
+    log.info("=== Starting Pin Creation Process ===")
     
-    image_path = Path(Config.DEFAULT_IMAGE_PATH)
-    if not validate_image_path(image_path):
-        return
+    image_paths = image_paths or [Path(Config.DEFAULT_IMAGE_PATH)]
 
-    if not (api_key := validate_api_key()):
+    secrets = Secrets.load()
+    if not (api_key := validate_api_key(secrets)):
         return
 
     configure_genai(api_key)
+    prompt = PROMPT
     if not (model := get_gemini_model(Config.GEMINI_MODEL_NAME)):
         return
 
-    if not (img := load_image(image_path)):
-        return
-
-    prompt = get_prompt()
-    if not (gemini_response := generate_gemini_content(model, prompt, img)):
-        return
+    pending = asyncio.run(process_images(model, prompt, image_paths, secrets))
 
-    if not (formatted_data := process_gemini_response(gemini_response)):
-        return
+    # Low-confidence uploads stay sequential so their prompts are asked one at a time.
+    for image_path, result in zip(image_paths, pending):
+        if isinstance(result, BaseException):
+            log.error("Processing %s failed: %s", image_path, result)
+            continue
+        if not result:
+            continue
+        formatted_data, image_bytes = result
 
-    if formatted_data.get("confidence_level", "low") != "high":
-        print(f"Warning: confidence level ({formatted_data['confidence_level']})")
+        log.warning("Confidence level for %s (%s)", image_path, formatted_data["confidence_level"])
         if input("Continue with upload? (y/n): ").lower() != "y":
-            return
+            continue
 
-    upload_to_pinterest(str(image_path), formatted_data)
-    print("\n=== Process Complete ===")
+        upload_to_pinterest(str(image_path), image_bytes, formatted_data, secrets)
+    log.info("=== Process Complete ===")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(name)s %(levelname)s %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
     load_dotenv()
-    main()
\ No newline at end of file
+    main([Path(arg) for arg in sys.argv[1:]])